@@ -4,11 +4,53 @@ This is the entry point of the application
 """
 
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
-from models.user import db, User
+from flask.json.provider import JSONProvider
+from flask_session import Session
+from models.user import db, bcrypt, cache, User, start_login_flusher
 from config.config import config
+from sqlalchemy import event
+import hashlib
 import os
 from datetime import timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(JSONProvider):
+    """
+    JSON provider backed by orjson
+
+    Serializes responses (including datetime objects) in C, so jsonify
+    in the auth and AJAX endpoints skips the stdlib json encoder
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    """
+    Apply SQLite performance pragmas on every new connection
+
+    Enables WAL journaling so readers are not blocked by writers,
+    relaxes fsync behavior, and raises the busy timeout and page cache
+
+    Args:
+        dbapi_conn: Raw DB-API connection from the pool
+        connection_record: SQLAlchemy connection record (unused)
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
 def create_app(config_name='default'):
     """
     Application factory function to create and configure the Flask app
@@ -25,17 +67,53 @@ def create_app(config_name='default'):
     
     # Load configuration
     app.config.from_object(config[config_name])
+    config[config_name].init_app(app)
+
+    # Use the faster orjson serializer for jsonify when available
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Initialize database
     db.init_app(app)
+
+    # Initialize password hashing (uses BCRYPT_LOG_ROUNDS from config)
+    bcrypt.init_app(app)
+
+    # Initialize the in-process cache for hot lookups
+    cache.init_app(app)
+
+    # Initialize server-side sessions so the cookie only carries a
+    # session id instead of signed, serialized session data
+    Session(app)
     
     # Configure session timeout (30 minutes)
     app.permanent_session_lifetime = timedelta(minutes=30)
     
-    # Create database tables if they don't exist
+    # Create database tables on first run only; the sentinel file lets
+    # every later worker startup skip the per-table schema checks.
+    # The sentinel is keyed to the configured database URI so pointing
+    # DATABASE_URL at a fresh database still triggers create_all()
+    uri_digest = hashlib.sha256(
+        app.config['SQLALCHEMY_DATABASE_URI'].encode('utf-8')
+    ).hexdigest()[:12]
+    sentinel = os.path.join(app.instance_path, '.db_initialized-' + uri_digest)
     with app.app_context():
-        db.create_all()
-    
+        # Tune SQLite before any other connection is handed out
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', _set_sqlite_pragmas)
+            # A deleted SQLite file invalidates the sentinel too
+            db_file = db.engine.url.database
+            if db_file and db_file != ':memory:' and not os.path.exists(db_file):
+                if os.path.exists(sentinel):
+                    os.remove(sentinel)
+        if not os.path.exists(sentinel):
+            db.create_all()
+            os.makedirs(app.instance_path, exist_ok=True)
+            open(sentinel, 'w').close()
+
+    # Start the background worker that batches last_login writes
+    start_login_flusher(app)
+
     # Import and register routes
     from routes.auth import auth_bp
     from routes.main import main_bp
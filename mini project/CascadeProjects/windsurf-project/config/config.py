@@ -14,6 +14,23 @@ class Config:
     # Database configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///users.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool settings so concurrent requests reuse connections
+    # instead of opening a new one per AJAX availability check
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800
+    }
+
+    # SQLite connections are safe to share across threads once WAL mode
+    # is enabled, and the timeout matches the busy_timeout pragma
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {
+            'check_same_thread': False,
+            'timeout': 30
+        }
     
     # Session configuration
     SESSION_TYPE = 'filesystem'
@@ -29,6 +46,11 @@ class Config:
     # Password hashing settings
     BCRYPT_LOG_ROUNDS = 12
 
+    @staticmethod
+    def init_app(app):
+        """Hook for configuration-specific app setup"""
+        pass
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -39,6 +61,19 @@ class ProductionConfig(Config):
     DEBUG = False
     SESSION_COOKIE_SECURE = True  # Enable HTTPS-only cookies in production
 
+    # Use Redis-backed sessions in production when REDIS_URL is set,
+    # falling back to the filesystem store otherwise; resolved in
+    # init_app so importing this module never pulls in redis
+    @staticmethod
+    def init_app(app):
+        """Switch to Redis-backed sessions when REDIS_URL is set"""
+        Config.init_app(app)
+
+        if os.environ.get('REDIS_URL'):
+            import redis
+            app.config['SESSION_TYPE'] = 'redis'
+            app.config['SESSION_REDIS'] = redis.from_url(os.environ['REDIS_URL'])
+
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
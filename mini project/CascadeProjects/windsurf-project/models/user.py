@@ -4,12 +4,59 @@ Defines the database schema for user authentication
 """
 
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_bcrypt import Bcrypt
+from flask_caching import Cache
+from werkzeug.security import check_password_hash
 from datetime import datetime
+import atexit
+import hashlib
+import queue
+import threading
+import time
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+# Initialize Bcrypt (bound to the app in create_app)
+bcrypt = Bcrypt()
+
+# Short-TTL in-process cache for hot lookups (bound to the app in create_app)
+cache = Cache(config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 60})
+
+# Bounded cache of verification results so repeat logins with the same
+# credentials skip the bcrypt key derivation entirely
+# Keys are (stored_hash, sha256(password)) so no plaintext is retained
+_VERIFY_CACHE_MAX = 4096
+_verify_cache = {}
+
+def _verify_password(stored_hash, password):
+    """
+    Verify a password against a stored hash, with caching
+
+    Args:
+        stored_hash (str): Stored password hash (bcrypt or legacy PBKDF2)
+        password (str): Plain text password to verify
+
+    Returns:
+        bool: True if password matches, False otherwise
+    """
+    cache_key = (stored_hash, hashlib.sha256(password.encode('utf-8')).hexdigest())
+    cached = _verify_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Accounts created before the bcrypt switch still hold werkzeug
+    # PBKDF2 hashes, so fall back for those
+    if stored_hash.startswith('pbkdf2:'):
+        result = check_password_hash(stored_hash, password)
+    else:
+        result = bcrypt.check_password_hash(stored_hash, password)
+
+    if len(_verify_cache) >= _VERIFY_CACHE_MAX:
+        _verify_cache.clear()
+    _verify_cache[cache_key] = result
+    return result
+
 class User(db.Model):
     """
     User model class representing the users table in the database
@@ -53,7 +100,7 @@ class User(db.Model):
         Args:
             password (str): Plain text password to hash
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
     
     def check_password(self, password):
         """
@@ -65,17 +112,61 @@ class User(db.Model):
         Returns:
             bool: True if password matches, False otherwise
         """
-        return check_password_hash(self.password_hash, password)
+        return _verify_password(self.password_hash, password)
     
+    @classmethod
+    def bulk_create(cls, records, chunk=200):
+        """
+        Create many users in one transaction (bulk import / seed data)
+
+        Password hashing is spread across CPU cores, and rows are
+        inserted with bulk_insert_mappings in chunks kept well under
+        SQLite's bound-variable limit, all committed at once instead
+        of one transaction per user
+
+        Args:
+            records (list): Dicts with 'username', 'email', and 'password'
+            chunk (int): Rows per INSERT statement
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from flask import current_app
+
+        rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        passwords = [record['password'] for record in records]
+        with ProcessPoolExecutor() as executor:
+            hashes = list(executor.map(_hash_password, passwords,
+                                       [rounds] * len(passwords)))
+
+        for start in range(0, len(records), chunk):
+            db.session.bulk_insert_mappings(cls, [
+                {
+                    'username': record['username'],
+                    'email': record['email'].lower(),
+                    'password_hash': password_hash
+                }
+                for record, password_hash in zip(records[start:start + chunk],
+                                                 hashes[start:start + chunk])
+            ])
+        db.session.commit()
+
     def update_last_login(self):
-        """Update the last_login timestamp to current time"""
+        """
+        Update the last_login timestamp to current time
+
+        The write is queued and flushed in batches by a background
+        worker so the login request does not pay for a commit
+        """
         self.last_login = datetime.utcnow()
-        db.session.commit()
+        _login_queue.put((self.id, self.last_login))
+        cache.delete_memoized(get_user_by_id, self.id)
     
     def to_dict(self):
         """
         Convert user object to dictionary representation
-        
+
+        Timestamps are returned as datetime objects; the app's JSON
+        provider serializes them directly
+
         Returns:
             dict: User data without sensitive information
         """
@@ -83,8 +174,8 @@ class User(db.Model):
             'id': self.id,
             'username': self.username,
             'email': self.email,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'created_at': self.created_at,
+            'last_login': self.last_login,
             'is_active': self.is_active
         }
     
@@ -92,6 +183,127 @@ class User(db.Model):
         """String representation of the User object"""
         return f'<User {self.username}>'
 
+@cache.memoize(60)
+def get_user_by_id(user_id):
+    """
+    Fetch a user by primary key, cached for 60 seconds
+
+    The cache entry is invalidated on logout and whenever the user
+    record changes (e.g. update_last_login)
+
+    Args:
+        user_id (int): Primary key of the user
+
+    Returns:
+        User: User instance, or None if not found
+    """
+    return User.query.get(user_id)
+
+def _hash_password(password, rounds):
+    """
+    Hash one password with bcrypt
+
+    Module-level so ProcessPoolExecutor workers can pickle it; uses the
+    bcrypt library directly since the Flask-Bcrypt extension is only
+    bound to an app in the parent process
+
+    Args:
+        password (str): Plain text password to hash
+        rounds (int): bcrypt log rounds (from BCRYPT_LOG_ROUNDS)
+
+    Returns:
+        str: bcrypt hash, decoded for storage in password_hash
+    """
+    import bcrypt as _bcrypt
+
+    return _bcrypt.hashpw(password.encode('utf-8'),
+                          _bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+# Queue of (user_id, timestamp) last_login updates waiting to be written
+# A background worker coalesces them into one UPDATE per batch so each
+# login does not pay for its own commit and fsync
+_login_queue = queue.Queue()
+_LOGIN_FLUSH_INTERVAL = 0.2  # seconds to wait for more updates to coalesce
+_LOGIN_FLUSH_BATCH = 32      # max updates per flush (well under SQLite's variable limit)
+
+_login_flusher_lock = threading.Lock()
+_login_flusher_started = False
+
+def _flush_last_logins(app, batch):
+    """
+    Write a batch of last_login updates in a single transaction
+
+    Args:
+        app (Flask): Application whose context provides the database
+        batch (dict): Mapping of user id to last_login timestamp
+    """
+    from sqlalchemy import case
+
+    with app.app_context():
+        try:
+            # This transaction only writes, so take SQLite's write lock
+            # up front: racing writers then queue on busy_timeout
+            # instead of failing with SQLITE_BUSY on lock upgrade.
+            # Read transactions elsewhere keep the default deferred
+            # begin and stay fully parallel under WAL
+            if db.engine.dialect.name == 'sqlite':
+                db.session.execute(db.text('BEGIN IMMEDIATE'))
+            db.session.execute(
+                db.update(User)
+                .where(User.id.in_(batch))
+                .values(last_login=case(batch, value=User.id))
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+def start_login_flusher(app):
+    """
+    Start the background thread that flushes queued last_login updates
+
+    Safe to call more than once; only one worker is ever started
+
+    Args:
+        app (Flask): Application the worker flushes against
+    """
+    global _login_flusher_started
+
+    with _login_flusher_lock:
+        if _login_flusher_started:
+            return
+        _login_flusher_started = True
+
+    def _worker():
+        while True:
+            user_id, timestamp = _login_queue.get()
+            # Give concurrent logins a moment to land in the queue
+            time.sleep(_LOGIN_FLUSH_INTERVAL)
+            batch = {user_id: timestamp}
+            while len(batch) < _LOGIN_FLUSH_BATCH:
+                try:
+                    user_id, timestamp = _login_queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch[user_id] = timestamp
+            _flush_last_logins(app, batch)
+
+    thread = threading.Thread(target=_worker, name='last-login-flusher', daemon=True)
+    thread.start()
+
+    def _flush_pending():
+        """Drain whatever is still queued when the process exits"""
+        batch = {}
+        while True:
+            try:
+                user_id, timestamp = _login_queue.get_nowait()
+            except queue.Empty:
+                break
+            batch[user_id] = timestamp
+        if batch:
+            _flush_last_logins(app, batch)
+
+    atexit.register(_flush_pending)
+
 def create_tables():
     """Create all database tables defined in the models"""
     db.create_all()
@@ -3,8 +3,10 @@ Main routes for the application
 Handles dashboard, home page, and other general routes
 """
 
-from flask import Blueprint, render_template, redirect, url_for, session, flash
+from flask import Blueprint, render_template, redirect, url_for, session, flash, g
 from functools import wraps
+from models.user import db, get_user_by_id
+from routes.auth import load_access_token
 
 # Create Blueprint for main routes
 main_bp = Blueprint('main', __name__)
@@ -12,18 +14,23 @@ main_bp = Blueprint('main', __name__)
 def login_required(f):
     """
     Decorator to require login for accessing routes
-    
+
+    Verifies the signed access token cookie locally (no session store
+    I/O) and exposes its payload as g.auth_token for the route
+
     Args:
         f (function): Route function to protect
-        
+
     Returns:
         function: Wrapped function that checks for login
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        token = load_access_token()
+        if token is None:
             flash('Please login to access this page', 'warning')
             return redirect(url_for('auth.login'))
+        g.auth_token = token
         return f(*args, **kwargs)
     return decorated_function
 
@@ -35,7 +42,7 @@ def index():
     """
     
     # If user is already logged in, redirect to dashboard
-    if 'user_id' in session:
+    if load_access_token() is not None:
         return redirect(url_for('main.dashboard'))
     
     return render_template('index.html')
@@ -48,11 +55,11 @@ def dashboard():
     Displays user information and available actions
     """
     
-    # Get user information from session
+    # Get user information from the verified access token
     user_info = {
-        'username': session.get('username'),
-        'email': session.get('email'),
-        'user_id': session.get('user_id')
+        'username': g.auth_token['u'],
+        'email': g.auth_token['e'],
+        'user_id': g.auth_token['uid']
     }
     
     return render_template('dashboard.html', user=user_info)
@@ -65,10 +72,8 @@ def profile():
     Displays detailed user information
     """
     
-    from models.user import User
-    
-    # Get full user information from database
-    user = User.query.get(session.get('user_id'))
+    # Get full user information from database (cached for 60 seconds)
+    user = get_user_by_id(g.auth_token['uid'])
     
     if not user:
         flash('User not found', 'error')
@@ -112,7 +117,6 @@ def internal_error(error):
         Rendered 500 page
     """
     
-    from models.user import db
     db.session.rollback()
     
     return render_template('errors/500.html'), 500